@@ -5,6 +5,7 @@ from typing import Dict, Optional, List
 import json
 from config import logger, DEXSCREENER_BASE_URL, PROXY_USERNAME, PROXY_PASSWORD
 from models.stats import PipelineStats
+from models.pair import PairSnapshot
 
 
 # These are whitelisted by IP so replace these with you own
@@ -153,23 +154,45 @@ async def make_concurrent_requests(
 
 async def fetch_token_pairs(
     token_address: str, chain_id: str, stats: PipelineStats, redis_client
-) -> List[Dict]:
+) -> Optional[List[PairSnapshot]]:
+    """A token's pairs, [] if it has none, or None if the lookup failed"""
     endpoint = f"/token-pairs/v1/{chain_id}/{token_address}"
     data = await make_request(endpoint, stats, redis_client)
+    if not isinstance(data, list):
+        return None
 
     pairs = []
-    if data and isinstance(data, list):
-        pairs = [
-            pair for pair in data if isinstance(pair, dict) and pair.get("pairAddress")
-        ]
-        logger.info(f"Found {len(pairs)} pairs for {token_address}")
+    for pair in data:
+        snapshot = PairSnapshot.from_api(pair, chain_id)
+        if snapshot:
+            pairs.append(snapshot)
+    logger.info(f"Found {len(pairs)} pairs for {token_address}")
+
+    return pairs
+
+
+async def fetch_pairs_by_address(
+    chain_id: str, pair_addresses: List[str], stats: PipelineStats, redis_client
+) -> Optional[List[PairSnapshot]]:
+    """Refresh up to 30 known pairs on one chain, or None if the request failed"""
+    endpoint = f"/latest/dex/pairs/{chain_id}/{','.join(pair_addresses)}"
+    data = await make_request(endpoint, stats, redis_client)
+    if not isinstance(data, dict):
+        return None
+
+    pairs = []
+    for pair in data.get("pairs") or []:
+        snapshot = PairSnapshot.from_api(pair, chain_id)
+        if snapshot:
+            pairs.append(snapshot)
+    logger.info(f"Refreshed {len(pairs)}/{len(pair_addresses)} pairs on {chain_id}")
 
     return pairs
 
 
 async def fetch_pairs_batch(
     tokens: List[Dict], stats: PipelineStats, redis_client, batch_size=30
-) -> List[Dict]:
+) -> List[List[PairSnapshot]]:
     pair_tasks = []
     for token in tokens:
         chain_id = next(iter(token["metadata"].values())).get("chain_id", "solana")
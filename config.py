@@ -7,6 +7,26 @@ REDIS_PREFIX = "dexscreener:"
 PROXY_USERNAME = config.PROXY_USERNAME
 PROXY_PASSWORD = config.PROXY_PASSWORD
 
+# Instrumentation Configuration
+LOOP_LAG_THRESHOLD_MS = config.LOOP_LAG_THRESHOLD_MS
+PROFILE_PHASES = [p.strip() for p in config.PROFILE_PHASES.split(",") if p.strip()]
+PROFILE_DIR = config.PROFILE_DIR
+
+# Export Configuration (export is disabled when EXPORT_DIR is empty)
+EXPORT_DIR = config.EXPORT_DIR
+EXPORT_FORMAT = config.EXPORT_FORMAT
+EXPORT_REDIS_STATE = config.EXPORT_REDIS_STATE
+
+# Pair Refresh Configuration ("tokens" or "addresses")
+PAIR_REFRESH_MODE = config.PAIR_REFRESH_MODE
+PAIR_DISCOVERY_INTERVAL = config.PAIR_DISCOVERY_INTERVAL
+
+# History Report Configuration (0 disables the pair_data report)
+HISTORY_REPORT_HOURS = config.HISTORY_REPORT_HOURS
+
+# Run Checkpoint Configuration (seconds without progress before a run is abandoned)
+RUN_CYCLE_TTL = config.RUN_CYCLE_TTL
+
 # Logging Configuration
 logging.basicConfig(
     level=logging.DEBUG,
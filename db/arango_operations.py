@@ -1,40 +1,245 @@
+import asyncio
+import hashlib
 import uuid
 from datetime import datetime, timezone
-from typing import Dict, List
+from typing import AsyncIterator, Dict, List, Optional
 from arango import ArangoClient
 from config import logger
+from models.pair import PairSnapshot
 
 
 async def store_pair_data(
     db: ArangoClient,
     token_address: str,
     chain_id: str,
-    pairs: List[Dict],
+    pairs: List[PairSnapshot],
     token_metadata: Dict,
-) -> None:
-    """Store pair data in ArangoDB"""
+    run_id: Optional[str] = None,
+    retries: int = 3,
+) -> bool:
+    """Store pair data in ArangoDB
+
+    With a run_id the document keys are derived from the run and pair, so a
+    retried or resumed batch replaces its earlier documents instead of
+    duplicating them.
+    """
     timestamp = datetime.now(timezone.utc).isoformat()
 
+    documents = []
     for pair in pairs:
-        document = {
-            "_key": str(uuid.uuid4()),
-            "timestamp": timestamp,
-            "chain_id": chain_id,
-            "token_address": token_address,
-            "token_metadata": token_metadata,
-            "pair_address": pair["pairAddress"],
-            "dex_id": pair.get("dexId"),
-            "pair_data": pair,
-            "metrics": {
-                "price_usd": pair.get("priceUsd"),
-                "liquidity_usd": pair.get("liquidity", {}).get("usd"),
-                "volume_24h": pair.get("volume", {}).get("h24"),
-                "pair_created_at": pair.get("pairCreatedAt"),
-            },
-        }
+        if run_id:
+            key = hashlib.sha1(
+                f"{run_id}:{token_address}:{pair.pair_address}".encode()
+            ).hexdigest()
+        else:
+            key = str(uuid.uuid4())
+
+        documents.append(
+            {
+                "_key": key,
+                "timestamp": timestamp,
+                "chain_id": chain_id,
+                "token_address": token_address,
+                "token_metadata": token_metadata,
+                "pair_address": pair.pair_address,
+                "dex_id": pair.dex_id,
+                "pair_data": pair.raw,
+                "metrics": pair.to_arango_metrics(),
+            }
+        )
 
+    for attempt in range(retries):
         try:
-            logger.info(f"Storing pair data for {pair['pairAddress']}")
-            db.collection("pair_data").insert(document)
+            logger.info(f"Storing {len(documents)} pair documents for {token_address}")
+            results = db.collection("pair_data").insert_many(
+                documents, overwrite_mode="replace", silent=False
+            )
+            failed = [
+                document
+                for document, result in zip(documents, results)
+                if isinstance(result, Exception)
+            ]
+            if not failed:
+                return True
+            logger.error(
+                f"Failed to store {len(failed)} pair documents for {token_address}, "
+                f"attempt {attempt + 1}"
+            )
+            documents = failed
         except Exception as e:
-            logger.error(f"Failed to store pair data: {str(e)}")
+            logger.error(
+                f"Failed to store pair data for {token_address}, "
+                f"attempt {attempt + 1}: {str(e)}"
+            )
+        await asyncio.sleep(0.5)
+
+    return False
+
+
+PAIR_DATA_INDEXES = [
+    {"name": "idx_timestamp", "fields": ["timestamp"]},
+    {"name": "idx_chain_dex_timestamp", "fields": ["chain_id", "dex_id", "timestamp"]},
+    {"name": "idx_pair_timestamp", "fields": ["pair_address", "timestamp"]},
+    {"name": "idx_token_timestamp", "fields": ["token_address", "timestamp"]},
+]
+
+
+def ensure_pair_data_indexes(db: ArangoClient) -> None:
+    """Create the persistent indexes used by the history queries"""
+    collection = db.collection("pair_data")
+    existing = {index.get("name") for index in collection.indexes()}
+
+    for index in PAIR_DATA_INDEXES:
+        if index["name"] in existing:
+            continue
+        logger.info(f"Creating persistent index {index['name']} on pair_data")
+        collection.add_index(
+            {
+                "type": "persistent",
+                "name": index["name"],
+                "fields": index["fields"],
+                "sparse": False,
+                "unique": False,
+            }
+        )
+
+
+async def stream_query(
+    db: ArangoClient,
+    query: str,
+    bind_vars: Optional[Dict] = None,
+    batch_size: int = 1000,
+) -> AsyncIterator[List[Dict]]:
+    """Run an AQL query as a streaming cursor and yield results in batches
+
+    python-arango is synchronous, so the query and every batch fetch run in a
+    worker thread to keep the HTTP round trips off the event loop.
+    """
+    cursor = await asyncio.to_thread(
+        db.aql.execute,
+        query,
+        bind_vars=bind_vars or {},
+        batch_size=batch_size,
+        stream=True,
+        ttl=300,
+    )
+
+    try:
+        while True:
+            buffered = cursor.batch()
+            if buffered:
+                batch = list(buffered)
+                buffered.clear()
+                yield batch
+            if not cursor.has_more():
+                break
+            await asyncio.to_thread(cursor.fetch)
+    finally:
+        await asyncio.to_thread(cursor.close, True)
+
+
+CHAIN_DEX_STATS_QUERY = """
+FOR d IN pair_data
+    FILTER d.timestamp >= @start AND d.timestamp <= @end
+    // TO_NUMBER(null) is 0; keep missing values null so AVERAGE skips them
+    LET liquidity = d.metrics.liquidity_usd
+    LET volume = d.metrics.volume_24h
+    COLLECT chain_id = d.chain_id, dex_id = d.dex_id
+    AGGREGATE
+        snapshots = COUNT(1),
+        pairs = COUNT_DISTINCT(d.pair_address),
+        tokens = COUNT_DISTINCT(d.token_address),
+        avg_liquidity_usd = AVERAGE(liquidity == null ? null : TO_NUMBER(liquidity)),
+        max_liquidity_usd = MAX(liquidity == null ? null : TO_NUMBER(liquidity)),
+        avg_volume_24h = AVERAGE(volume == null ? null : TO_NUMBER(volume)),
+        max_volume_24h = MAX(volume == null ? null : TO_NUMBER(volume))
+    SORT pairs DESC
+    RETURN {
+        chain_id, dex_id, snapshots, pairs, tokens,
+        avg_liquidity_usd, max_liquidity_usd, avg_volume_24h, max_volume_24h
+    }
+"""
+
+PAIR_HISTORY_QUERY = """
+FOR d IN pair_data
+    FILTER d.pair_address == @pair_address
+    FILTER d.timestamp >= @start AND d.timestamp <= @end
+    SORT d.timestamp ASC
+    LET price = d.metrics.price_usd
+    LET liquidity = d.metrics.liquidity_usd
+    LET volume = d.metrics.volume_24h
+    RETURN {
+        timestamp: d.timestamp,
+        price_usd: price == null ? null : TO_NUMBER(price),
+        liquidity_usd: liquidity == null ? null : TO_NUMBER(liquidity),
+        volume_24h: volume == null ? null : TO_NUMBER(volume)
+    }
+"""
+
+TOP_MOVERS_QUERY = """
+FOR d IN pair_data
+    FILTER d.timestamp >= @start AND d.timestamp <= @end
+    COLLECT pair_address = d.pair_address, chain_id = d.chain_id, dex_id = d.dex_id
+    AGGREGATE first_ts = MIN(d.timestamp), last_ts = MAX(d.timestamp)
+    FILTER first_ts != last_ts
+    LET first_raw = FIRST(
+        FOR x IN pair_data
+            FILTER x.pair_address == pair_address AND x.timestamp == first_ts
+            LIMIT 1
+            RETURN x.metrics[@metric]
+    )
+    LET last_raw = FIRST(
+        FOR x IN pair_data
+            FILTER x.pair_address == pair_address AND x.timestamp == last_ts
+            LIMIT 1
+            RETURN x.metrics[@metric]
+    )
+    // TO_NUMBER(null) is 0, so drop missing values before converting
+    FILTER first_raw != null AND last_raw != null
+    LET first = TO_NUMBER(first_raw)
+    LET last = TO_NUMBER(last_raw)
+    FILTER first > 0
+    LET change_pct = (last - first) / first * 100
+    SORT ABS(change_pct) DESC
+    LIMIT @limit
+    RETURN {
+        pair_address, chain_id, dex_id, first_ts, last_ts,
+        first_value: first, last_value: last, change_pct
+    }
+"""
+
+
+async def aggregate_chain_dex_stats(
+    db: ArangoClient, start: str, end: str
+) -> List[Dict]:
+    """Aggregate pair_data snapshots per chain and DEX inside a time window"""
+    results = []
+    async for batch in stream_query(
+        db, CHAIN_DEX_STATS_QUERY, {"start": start, "end": end}
+    ):
+        results.extend(batch)
+    return results
+
+
+async def iter_pair_history(
+    db: ArangoClient, pair_address: str, start: str, end: str, batch_size: int = 1000
+) -> AsyncIterator[List[Dict]]:
+    """Yield the metric history of a single pair in timestamp order"""
+    bind_vars = {"pair_address": pair_address, "start": start, "end": end}
+    async for batch in stream_query(db, PAIR_HISTORY_QUERY, bind_vars, batch_size):
+        yield batch
+
+
+async def get_top_movers(
+    db: ArangoClient,
+    start: str,
+    end: str,
+    metric: str = "price_usd",
+    limit: int = 20,
+) -> List[Dict]:
+    """Pairs with the largest relative change of a metric inside a time window"""
+    bind_vars = {"start": start, "end": end, "metric": metric, "limit": limit}
+    results = []
+    async for batch in stream_query(db, TOP_MOVERS_QUERY, bind_vars):
+        results.extend(batch)
+    return results
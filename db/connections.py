@@ -2,6 +2,7 @@ from typing import Tuple
 import redis.asyncio as redis
 from arango import ArangoClient
 from config import logger
+from db.arango_operations import ensure_pair_data_indexes
 
 
 async def init_db_connections(
@@ -27,5 +28,7 @@ async def init_db_connections(
         logger.info("Creating pair_data collection in ArangoDB")
         db.create_collection("pair_data")
 
+    ensure_pair_data_indexes(db)
+
     logger.info("Database connections initialized successfully")
     return redis_client, db
@@ -1,8 +1,10 @@
+import asyncio
 from typing import Dict, List, Optional
 import json
 from datetime import datetime, timezone
 import redis.asyncio as redis
 from config import logger, REDIS_PREFIX
+from models.pair import PairSnapshot
 
 
 async def store_token_addresses(
@@ -71,56 +73,89 @@ async def get_token_metadata(redis_client: redis.Redis, token_address: str) -> D
 
 
 async def store_token_pairs_in_redis(
-    token_address: str, pairs: List[Dict], redis_client: redis.Redis
+    token_address: str,
+    pairs: List[PairSnapshot],
+    redis_client: redis.Redis,
+    retries: int = 3,
+    update_summary: bool = True,
+) -> bool:
+    """Store token pairs data in Redis for analysis
+
+    All writes for the token go out in one MULTI/EXEC transaction, so an
+    interrupted batch leaves nothing half-written and can simply be retried.
+    Pass update_summary=False when pairs is only a subset of the token's
+    pairs, so the summary keeps describing the full set.
+    """
+    base_key = f"{REDIS_PREFIX}pairs:{token_address}"
+    timestamp = datetime.now(timezone.utc).isoformat()
+
+    # Store summary info
+    summary = {
+        "token_address": token_address,
+        "total_pairs": str(len(pairs)),
+        "dexes": json.dumps([pair.dex_id for pair in pairs if pair.dex_id]),
+        "updated_at": timestamp,
+    }
+
+    for attempt in range(retries):
+        try:
+            async with redis_client.pipeline(transaction=True) as pipe:
+                if update_summary:
+                    pipe.hset(f"{base_key}:summary", mapping=summary)
+
+                # Store pair addresses
+                pair_addresses = [pair.pair_address for pair in pairs]
+                if pair_addresses:
+                    pipe.sadd(f"{base_key}:addresses", *pair_addresses)
+
+                # Store pair data
+                for pair in pairs:
+                    pair_key = f"{base_key}:pair:{pair.pair_address}"
+                    pipe.hset(
+                        f"{pair_key}:metrics", mapping=pair.to_redis_metrics(timestamp)
+                    )
+                    pipe.set(f"{pair_key}:data", pair.raw_json)
+
+                await pipe.execute()
+            return True
+
+        except Exception as e:
+            logger.error(
+                f"Failed to store pairs in Redis for token {token_address}, "
+                f"attempt {attempt + 1}: {str(e)}"
+            )
+            await asyncio.sleep(0.5)
+
+    return False
+
+
+async def get_tracked_pair_addresses(
+    redis_client: redis.Redis, token_address: str
+) -> List[str]:
+    """Pair addresses already discovered for a token"""
+    members = await redis_client.smembers(
+        f"{REDIS_PREFIX}pairs:{token_address}:addresses"
+    )
+    return [m.decode() if isinstance(m, bytes) else m for m in members]
+
+
+async def get_discovery_times(redis_client: redis.Redis) -> Dict[str, float]:
+    """When each token last went through a full token-pairs lookup"""
+    entries = await redis_client.zrange(
+        f"{REDIS_PREFIX}pairs:discovered_at", 0, -1, withscores=True
+    )
+    return {
+        (token.decode() if isinstance(token, bytes) else token): score
+        for token, score in entries
+    }
+
+
+async def mark_tokens_discovered(
+    redis_client: redis.Redis, token_addresses: List[str]
 ) -> None:
-    """Store token pairs data in Redis for analysis"""
-    try:
-        base_key = f"{REDIS_PREFIX}pairs:{token_address}"
-        timestamp = datetime.now(timezone.utc).isoformat()
-
-        # Store summary info
-        summary = {
-            "token_address": token_address,
-            "total_pairs": str(len(pairs)),
-            "dexes": json.dumps(
-                [pair.get("dexId") for pair in pairs if pair.get("dexId")]
-            ),
-            "updated_at": timestamp,
-        }
-
-        summary_key = f"{base_key}:summary"
-        await redis_client.hmset(summary_key, summary)
-
-        # Store pair addresses
-        addresses_key = f"{base_key}:addresses"
-        pair_addresses = [
-            pair.get("pairAddress") for pair in pairs if pair.get("pairAddress")
-        ]
-        if pair_addresses:
-            await redis_client.sadd(addresses_key, *pair_addresses)
-
-        # Store pair data
-        for pair in pairs:
-            pair_address = pair.get("pairAddress")
-            if pair_address:
-                metrics = {
-                    "pair_address": pair_address,
-                    "dex_id": pair.get("dexId", ""),
-                    "price_usd": str(pair.get("priceUsd", "")),
-                    "liquidity_usd": str(pair.get("liquidity", {}).get("usd", "")),
-                    "volume_24h": str(pair.get("volume", {}).get("h24", "")),
-                    "pair_created_at": str(pair.get("pairCreatedAt", "")),
-                    "updated_at": timestamp,
-                }
-
-                metrics_key = f"{base_key}:pair:{pair_address}:metrics"
-                await redis_client.hmset(metrics_key, metrics)
-
-                full_key = f"{base_key}:pair:{pair_address}:data"
-                await redis_client.set(full_key, json.dumps(pair))
-
-    except Exception as e:
-        logger.error(
-            f"Failed to store pairs in Redis for token {token_address}: {str(e)}"
+    if token_addresses:
+        now = datetime.now(timezone.utc).timestamp()
+        await redis_client.zadd(
+            f"{REDIS_PREFIX}pairs:discovered_at",
+            {token: now for token in token_addresses},
         )
-        logger.error("Error details:", exc_info=True)
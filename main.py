@@ -1,6 +1,18 @@
 import asyncio
 import sys
-from config import logger
+from config import (
+    logger,
+    LOOP_LAG_THRESHOLD_MS,
+    PROFILE_PHASES,
+    PROFILE_DIR,
+    EXPORT_DIR,
+    EXPORT_FORMAT,
+    EXPORT_REDIS_STATE,
+    PAIR_REFRESH_MODE,
+    PAIR_DISCOVERY_INTERVAL,
+    HISTORY_REPORT_HOURS,
+    RUN_CYCLE_TTL,
+)
 from models.stats import PipelineStats
 from db.connections import init_db_connections
 from services.token_service import (
@@ -8,9 +20,13 @@ from services.token_service import (
     fetch_latest_boosts,
     fetch_top_boosts,
 )
-from services.pair_service import process_solana_pairs
-from services.analysis_service import analyze_pairs
+from services.pair_service import process_solana_pairs, refresh_known_pairs
+from services.analysis_service import analyze_pairs, analyze_pair_history
+from services.signal_service import SignalConfig, SignalEngine
+from services.run_service import RunCheckpoint
+from services.export_service import SnapshotExporter, export_redis_state
 from utils.config import Config
+from utils.profiling import LoopLagMonitor, PhaseProfiler
 import time
 
 config = Config()
@@ -23,28 +39,107 @@ async def run_pipeline(
     logger.info("Starting DexScreener pipeline")
 
     stats = PipelineStats()
-    redis_client, db = await init_db_connections(
-        redis_url, arango_url, db_name, username, password
+
+    lag_monitor = LoopLagMonitor(threshold=LOOP_LAG_THRESHOLD_MS / 1000)
+    profiler = PhaseProfiler(PROFILE_PHASES, PROFILE_DIR)
+    signal_engine = SignalEngine(
+        SignalConfig(
+            halflife=config.SIGNAL_HALFLIFE,
+            window=config.SIGNAL_WINDOW,
+            warmup_samples=config.SIGNAL_WARMUP_SAMPLES,
+            cooldown_samples=config.SIGNAL_COOLDOWN_SAMPLES,
+            liquidity_drop_pct=config.SIGNAL_LIQUIDITY_DROP_PCT,
+            volume_zscore=config.SIGNAL_VOLUME_ZSCORE,
+            volume_spike_pct=config.SIGNAL_VOLUME_SPIKE_PCT,
+            price_move_pct=config.SIGNAL_PRICE_MOVE_PCT,
+            price_zscore=config.SIGNAL_PRICE_ZSCORE,
+            checkpoint_interval=config.SIGNAL_CHECKPOINT_INTERVAL,
+            stream_maxlen=config.SIGNAL_STREAM_MAXLEN,
+            state_ttl=config.SIGNAL_STATE_TTL,
+        )
     )
+    redis_client = None
+    exporter = None
 
     try:
+        lag_monitor.start()
+        profiler.install_signal_handler()
+
+        with profiler.phase("connect"):
+            redis_client, db = await init_db_connections(
+                redis_url, arango_url, db_name, username, password
+            )
+
+        await signal_engine.load_checkpoint(redis_client)
+
+        # Resumes the unfinished run of this cycle, if any
+        checkpoint = RunCheckpoint(redis_client, cycle_ttl=RUN_CYCLE_TTL)
+        await checkpoint.start()
+        if EXPORT_DIR:
+            exporter = SnapshotExporter(
+                EXPORT_DIR, EXPORT_FORMAT, run_id=checkpoint.run_id
+            )
+
         # Fetch and store latest boosts
-        logger.info("=== Starting Latest Boosts Phase ===")
-        await fetch_latest_boosts(redis_client, stats)
-        await asyncio.sleep(1)
+        if not checkpoint.phase_done("latest_boosts"):
+            logger.info("=== Starting Latest Boosts Phase ===")
+            with profiler.phase("latest_boosts"):
+                await fetch_latest_boosts(redis_client, stats)
+            await checkpoint.complete_phase("latest_boosts")
+            await asyncio.sleep(1)
 
         # Fetch and store top boosts
-        logger.info("=== Starting Top Boosts Phase ===")
-        await fetch_top_boosts(redis_client, stats)
+        if not checkpoint.phase_done("top_boosts"):
+            logger.info("=== Starting Top Boosts Phase ===")
+            with profiler.phase("top_boosts"):
+                await fetch_top_boosts(redis_client, stats)
+            await checkpoint.complete_phase("top_boosts")
 
         # Add new token profiles phase
-        logger.info("=== Starting Token Profiles Phase ===")
-        await fetch_token_profiles(redis_client, stats)
-        await asyncio.sleep(1)
+        if not checkpoint.phase_done("token_profiles"):
+            logger.info("=== Starting Token Profiles Phase ===")
+            with profiler.phase("token_profiles"):
+                await fetch_token_profiles(redis_client, stats)
+            await checkpoint.complete_phase("token_profiles")
+            await asyncio.sleep(1)
 
         # Process pair data
         logger.info("=== Starting Pair Data Processing Phase ===")
-        await process_solana_pairs(redis_client, db, stats)
+        with profiler.phase("pairs"):
+            if PAIR_REFRESH_MODE == "addresses":
+                await refresh_known_pairs(
+                    redis_client,
+                    db,
+                    stats,
+                    signal_engine,
+                    checkpoint,
+                    exporter,
+                    discovery_interval=PAIR_DISCOVERY_INTERVAL,
+                )
+            else:
+                await process_solana_pairs(
+                    redis_client, db, stats, signal_engine, checkpoint, exporter
+                )
+
+        if exporter:
+            logger.info("=== Starting Export Phase ===")
+            with profiler.phase("export"):
+                await exporter.flush()
+                if EXPORT_REDIS_STATE:
+                    await export_redis_state(
+                        redis_client,
+                        EXPORT_DIR,
+                        EXPORT_FORMAT,
+                        run_id=checkpoint.run_id,
+                    )
+
+        await checkpoint.finish()
+
+        if HISTORY_REPORT_HOURS:
+            logger.info("=== Starting Pair History Report Phase ===")
+            with profiler.phase("history_report"):
+                await analyze_pair_history(db, HISTORY_REPORT_HOURS)
+        logger.info(f"Signals emitted: {signal_engine.alerts_emitted}")
 
         elapsed_time = time.time() - start_time
         logger.info(f"Pipeline completed in {elapsed_time:.2f} seconds")
@@ -54,7 +149,24 @@ async def run_pipeline(
         logger.error(f"Pipeline execution failed: {str(e)}")
         raise
     finally:
-        await redis_client.aclose()
+        # Each cleanup step is guarded so one failure (e.g. Redis being down)
+        # neither masks the original error nor skips the remaining steps
+        if exporter:
+            try:
+                await exporter.flush()
+            except Exception as e:
+                logger.error(f"Final export flush failed: {str(e)}")
+        if redis_client:
+            try:
+                await signal_engine.checkpoint(redis_client)
+            except Exception as e:
+                logger.error(f"Signal checkpoint failed: {str(e)}")
+            try:
+                await redis_client.aclose()
+            except Exception as e:
+                logger.error(f"Closing Redis failed: {str(e)}")
+        profiler.remove_signal_handler()
+        await lag_monitor.stop()
         logger.info("Pipeline shutdown complete")
 
 
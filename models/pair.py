@@ -0,0 +1,199 @@
+import json
+import math
+from typing import Dict, Optional, Tuple
+
+
+def _to_float(value) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value) -> Optional[int]:
+    number = _to_float(value)
+    if number is None or not math.isfinite(number):
+        return None
+    return int(number)
+
+
+def _encode(value) -> str:
+    return "" if value is None else str(value)
+
+
+class PairSnapshot:
+    """A DexScreener pair parsed and type-converted once at fetch time"""
+
+    __slots__ = (
+        "pair_address",
+        "chain_id",
+        "dex_id",
+        "base_token_address",
+        "quote_token_address",
+        "price_usd",
+        "price_native",
+        "liquidity_usd",
+        "volume_24h",
+        "price_change_24h",
+        "pair_created_at",
+        "raw",
+        "_raw_json",
+        "_redis_values",
+    )
+
+    def __init__(
+        self,
+        pair_address: str,
+        chain_id: str,
+        dex_id: str = "",
+        base_token_address: str = "",
+        quote_token_address: str = "",
+        price_usd: Optional[float] = None,
+        price_native: Optional[float] = None,
+        liquidity_usd: Optional[float] = None,
+        volume_24h: Optional[float] = None,
+        price_change_24h: Optional[float] = None,
+        pair_created_at: Optional[int] = None,
+        raw: Optional[Dict] = None,
+    ):
+        self.pair_address = pair_address
+        self.chain_id = chain_id
+        self.dex_id = dex_id
+        self.base_token_address = base_token_address
+        self.quote_token_address = quote_token_address
+        self.price_usd = price_usd
+        self.price_native = price_native
+        self.liquidity_usd = liquidity_usd
+        self.volume_24h = volume_24h
+        self.price_change_24h = price_change_24h
+        self.pair_created_at = pair_created_at
+        self.raw = raw
+        self._raw_json = None
+        self._redis_values = None
+
+    @classmethod
+    def from_api(
+        cls, pair: Dict, default_chain_id: str = "solana"
+    ) -> Optional["PairSnapshot"]:
+        """Build a snapshot from a raw API pair, or None if it has no address"""
+        if not isinstance(pair, dict):
+            return None
+        pair_address = pair.get("pairAddress")
+        if not pair_address:
+            return None
+
+        liquidity = pair.get("liquidity") or {}
+        volume = pair.get("volume") or {}
+        price_change = pair.get("priceChange") or {}
+        base_token = pair.get("baseToken") or {}
+        quote_token = pair.get("quoteToken") or {}
+
+        snapshot = cls(
+            pair_address=pair_address,
+            chain_id=pair.get("chainId") or default_chain_id,
+            dex_id=pair.get("dexId") or "",
+            base_token_address=base_token.get("address") or "",
+            quote_token_address=quote_token.get("address") or "",
+            price_usd=_to_float(pair.get("priceUsd")),
+            price_native=_to_float(pair.get("priceNative")),
+            liquidity_usd=_to_float(liquidity.get("usd")),
+            volume_24h=_to_float(volume.get("h24")),
+            price_change_24h=_to_float(price_change.get("h24")),
+            pair_created_at=_to_int(pair.get("pairCreatedAt")),
+            raw=pair,
+        )
+        # Redis keeps the API's own formatting, so encode those values once here
+        snapshot._redis_values = (
+            _encode(pair.get("priceUsd")),
+            _encode(liquidity.get("usd")),
+            _encode(volume.get("h24")),
+            _encode(pair.get("pairCreatedAt")),
+        )
+        return snapshot
+
+    @property
+    def raw_json(self) -> str:
+        """The raw pair encoded as JSON, serialized at most once"""
+        if self._raw_json is None:
+            self._raw_json = json.dumps(self.raw)
+        return self._raw_json
+
+    def to_redis_metrics(self, updated_at: str) -> Dict[str, str]:
+        """Flat string mapping for the Redis metrics hash
+
+        Values keep the API's own formatting (e.g. "0.00000123" rather than
+        "1.23e-06") for snapshots built by from_api.
+        """
+        if self._redis_values is None:
+            self._redis_values = (
+                _encode(self.price_usd),
+                _encode(self.liquidity_usd),
+                _encode(self.volume_24h),
+                _encode(self.pair_created_at),
+            )
+        price, liquidity, volume, created_at = self._redis_values
+
+        return {
+            "pair_address": self.pair_address,
+            "chain_id": self.chain_id,
+            "dex_id": self.dex_id,
+            "price_usd": price,
+            "liquidity_usd": liquidity,
+            "volume_24h": volume,
+            "pair_created_at": created_at,
+            "updated_at": updated_at,
+        }
+
+    def to_arango_metrics(self) -> Dict:
+        """Numeric metrics sub-document for pair_data"""
+        return {
+            "price_usd": self.price_usd,
+            "liquidity_usd": self.liquidity_usd,
+            "volume_24h": self.volume_24h,
+            "price_change_24h": self.price_change_24h,
+            "pair_created_at": self.pair_created_at,
+        }
+
+    def to_analytics(self) -> Tuple[str, str, float, float]:
+        """(chain_id, dex_id, liquidity_usd, volume_24h) with missing values as 0"""
+        return (
+            self.chain_id,
+            self.dex_id or "unknown",
+            self.liquidity_usd or 0.0,
+            self.volume_24h or 0.0,
+        )
+
+    @classmethod
+    def from_redis_metrics(
+        cls, metrics: Dict[bytes, bytes]
+    ) -> Optional["PairSnapshot"]:
+        """Rebuild a snapshot without raw data from a stored metrics hash"""
+        fields = {k.decode(): v.decode() for k, v in metrics.items()}
+        if not fields.get("pair_address") or not fields.get("chain_id"):
+            return None
+
+        return cls(
+            pair_address=fields["pair_address"],
+            chain_id=fields["chain_id"],
+            dex_id=fields.get("dex_id", ""),
+            price_usd=_to_float(fields.get("price_usd")),
+            liquidity_usd=_to_float(fields.get("liquidity_usd")),
+            volume_24h=_to_float(fields.get("volume_24h")),
+            pair_created_at=_to_int(fields.get("pair_created_at")),
+        )
+
+    @classmethod
+    def analytics_from_redis_metrics(
+        cls, metrics: Dict[bytes, bytes]
+    ) -> Optional[Tuple[str, str, float, float]]:
+        """Analytics tuple straight from a stored metrics hash, skipping the raw JSON"""
+        snapshot = cls.from_redis_metrics(metrics)
+        return snapshot.to_analytics() if snapshot else None
+
+    def __repr__(self) -> str:
+        return (
+            f"PairSnapshot({self.chain_id}/{self.dex_id} {self.pair_address} "
+            f"price={self.price_usd} liquidity={self.liquidity_usd})"
+        )
@@ -0,0 +1,164 @@
+import math
+from collections import deque
+from typing import Dict, Optional
+
+
+class Ewma:
+    """Exponentially weighted mean and variance with O(1) updates"""
+
+    __slots__ = ("alpha", "mean", "var", "count")
+
+    def __init__(
+        self, alpha: float, mean: float = 0.0, var: float = 0.0, count: int = 0
+    ):
+        self.alpha = alpha
+        self.mean = mean
+        self.var = var
+        self.count = count
+
+    @classmethod
+    def from_halflife(cls, halflife: float) -> "Ewma":
+        return cls(alpha=1 - math.exp(math.log(0.5) / halflife))
+
+    def zscore(self, value: float) -> Optional[float]:
+        """Z-score of value against the current mean, before it is added"""
+        if self.count < 2 or self.var <= 0:
+            return None
+        return (value - self.mean) / math.sqrt(self.var)
+
+    def update(self, value: float) -> None:
+        if self.count == 0:
+            self.mean = value
+            self.var = 0.0
+        else:
+            diff = value - self.mean
+            incr = self.alpha * diff
+            self.mean += incr
+            self.var = (1 - self.alpha) * (self.var + diff * incr)
+        self.count += 1
+
+    def to_dict(self) -> Dict:
+        return {
+            "alpha": self.alpha,
+            "mean": self.mean,
+            "var": self.var,
+            "count": self.count,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Ewma":
+        return cls(data["alpha"], data["mean"], data["var"], data["count"])
+
+
+class RollingExtrema:
+    """Rolling min and max over the last `window` samples using monotonic deques"""
+
+    __slots__ = ("window", "index", "_min", "_max")
+
+    def __init__(self, window: int, index: int = 0):
+        self.window = window
+        self.index = index
+        self._min = deque()
+        self._max = deque()
+
+    def update(self, value: float) -> None:
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((self.index, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((self.index, value))
+
+        oldest = self.index - self.window + 1
+        while self._min[0][0] < oldest:
+            self._min.popleft()
+        while self._max[0][0] < oldest:
+            self._max.popleft()
+        self.index += 1
+
+    @property
+    def min(self) -> Optional[float]:
+        return self._min[0][1] if self._min else None
+
+    @property
+    def max(self) -> Optional[float]:
+        return self._max[0][1] if self._max else None
+
+    def to_dict(self) -> Dict:
+        return {
+            "window": self.window,
+            "index": self.index,
+            "min": list(self._min),
+            "max": list(self._max),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RollingExtrema":
+        extrema = cls(data["window"], data["index"])
+        extrema._min.extend(tuple(item) for item in data["min"])
+        extrema._max.extend(tuple(item) for item in data["max"])
+        return extrema
+
+
+class PairSignalState:
+    """Rolling windows tracked per pair by the signal engine"""
+
+    __slots__ = (
+        "price",
+        "price_range",
+        "volume",
+        "liquidity_range",
+        "samples",
+        "last_alerts",
+        "last_seen",
+    )
+
+    def __init__(
+        self,
+        price: Ewma,
+        price_range: RollingExtrema,
+        volume: Ewma,
+        liquidity_range: RollingExtrema,
+        samples: int = 0,
+        last_alerts: Optional[Dict[str, int]] = None,
+        last_seen: Optional[float] = None,
+    ):
+        self.price = price
+        self.price_range = price_range
+        self.volume = volume
+        self.liquidity_range = liquidity_range
+        self.samples = samples
+        self.last_alerts = last_alerts or {}
+        self.last_seen = last_seen
+
+    @classmethod
+    def create(cls, halflife: float, window: int) -> "PairSignalState":
+        return cls(
+            price=Ewma.from_halflife(halflife),
+            price_range=RollingExtrema(window),
+            volume=Ewma.from_halflife(halflife),
+            liquidity_range=RollingExtrema(window),
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "price": self.price.to_dict(),
+            "price_range": self.price_range.to_dict(),
+            "volume": self.volume.to_dict(),
+            "liquidity_range": self.liquidity_range.to_dict(),
+            "samples": self.samples,
+            "last_alerts": self.last_alerts,
+            "last_seen": self.last_seen,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PairSignalState":
+        return cls(
+            price=Ewma.from_dict(data["price"]),
+            price_range=RollingExtrema.from_dict(data["price_range"]),
+            volume=Ewma.from_dict(data["volume"]),
+            liquidity_range=RollingExtrema.from_dict(data["liquidity_range"]),
+            samples=data["samples"],
+            last_alerts=data["last_alerts"],
+            last_seen=data.get("last_seen"),
+        )
@@ -1,6 +1,10 @@
 import json
+from datetime import datetime, timedelta, timezone
 import redis.asyncio as redis
+from arango import ArangoClient
 from config import logger, REDIS_PREFIX
+from db.arango_operations import aggregate_chain_dex_stats, get_top_movers
+from models.pair import PairSnapshot
 
 
 async def analyze_pairs():
@@ -41,15 +45,22 @@ async def analyze_pairs():
 
             for pair_address in pair_addresses:
                 pair_address = pair_address.decode()
-                data_key = (
-                    f"{REDIS_PREFIX}pairs:{token_address}:pair:{pair_address}:data"
-                )
-                full_data = await redis_client.get(data_key)
-
-                if full_data:
-                    pair_data = json.loads(full_data)
-                    chain_id = pair_data.get("chainId", "unknown")
-                    dex_id = pair_data.get("dexId", "unknown")
+                pair_key = f"{REDIS_PREFIX}pairs:{token_address}:pair:{pair_address}"
+                metrics = await redis_client.hgetall(f"{pair_key}:metrics")
+                values = PairSnapshot.analytics_from_redis_metrics(metrics)
+
+                # Metrics written before chain_id was stored need the full JSON
+                if values is None:
+                    full_data = await redis_client.get(f"{pair_key}:data")
+                    if full_data:
+                        snapshot = PairSnapshot.from_api(
+                            json.loads(full_data), "unknown"
+                        )
+                        if snapshot:
+                            values = snapshot.to_analytics()
+
+                if values:
+                    chain_id, dex_id, liquidity, volume = values
 
                     chain_counts[chain_id] = chain_counts.get(chain_id, 0) + 1
                     chain_active_tokens[chain_id] = chain_active_tokens.get(
@@ -57,9 +68,6 @@ async def analyze_pairs():
                     )
                     chain_active_tokens[chain_id].add(token_address)
 
-                    liquidity = float(pair_data.get("liquidity", {}).get("usd", 0) or 0)
-                    volume = float(pair_data.get("volume", {}).get("h24", 0) or 0)
-
                     chain_liquidity[chain_id] = (
                         chain_liquidity.get(chain_id, 0) + liquidity
                     )
@@ -99,3 +107,51 @@ async def analyze_pairs():
         logger.error("Error details:", exc_info=True)
     finally:
         await redis_client.aclose()
+
+
+async def analyze_pair_history(
+    db: ArangoClient, hours: int = 24, top_movers_limit: int = 10
+) -> None:
+    """Report chain/DEX aggregates and top movers straight from pair_data"""
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(hours=hours)
+    start_ts, end_ts = start.isoformat(), end.isoformat()
+
+    try:
+        dex_stats = await aggregate_chain_dex_stats(db, start_ts, end_ts)
+
+        chains = {}
+        for row in dex_stats:
+            chains.setdefault(row["chain_id"], []).append(row)
+
+        logger.info(f"\n=== Pair History ({hours}h) Chain Distribution ===")
+        for chain_id, rows in sorted(
+            chains.items(), key=lambda x: sum(r["pairs"] for r in x[1]), reverse=True
+        ):
+            chain_pairs = sum(row["pairs"] for row in rows)
+            chain_snapshots = sum(row["snapshots"] for row in rows)
+
+            logger.info(f"\nChain: {chain_id}")
+            logger.info(f"  Snapshots: {chain_snapshots}")
+            logger.info(f"  Distinct Pairs: {chain_pairs}")
+            logger.info("  DEX Distribution:")
+            for row in rows:
+                logger.info(
+                    f"    {row['dex_id']}: {row['pairs']} pairs, "
+                    f"{row['tokens']} tokens, "
+                    f"avg liquidity ${row['avg_liquidity_usd'] or 0:,.2f}, "
+                    f"avg 24h volume ${row['avg_volume_24h'] or 0:,.2f}"
+                )
+
+        movers = await get_top_movers(db, start_ts, end_ts, limit=top_movers_limit)
+        logger.info(f"\n=== Top {len(movers)} Price Movers ({hours}h) ===")
+        for mover in movers:
+            logger.info(
+                f"  {mover['chain_id']}/{mover['dex_id']} {mover['pair_address']}: "
+                f"{mover['change_pct']:+.1f}% "
+                f"(${mover['first_value']:.8g} -> ${mover['last_value']:.8g})"
+            )
+
+    except Exception as e:
+        logger.error(f"History analysis failed: {str(e)}")
+        logger.error("Error details:", exc_info=True)
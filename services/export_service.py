@@ -0,0 +1,223 @@
+import asyncio
+import os
+import uuid
+import redis.asyncio as redis
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from config import logger, REDIS_PREFIX
+from models.pair import PairSnapshot
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+EXPORT_FORMATS = {"arrow": "arrow", "parquet": "parquet"}
+
+SNAPSHOT_COLUMNS = [
+    ("timestamp", "timestamp"),
+    ("run_id", "string"),
+    ("dex_id", "string"),
+    ("token_address", "string"),
+    ("pair_address", "string"),
+    ("base_token_address", "string"),
+    ("quote_token_address", "string"),
+    ("price_usd", "float64"),
+    ("price_native", "float64"),
+    ("liquidity_usd", "float64"),
+    ("volume_24h", "float64"),
+    ("price_change_24h", "float64"),
+    ("pair_created_at", "int64"),
+]
+
+
+def _arrow_schema() -> "pa.Schema":
+    types = {
+        "timestamp": pa.timestamp("us", tz="UTC"),
+        "string": pa.string(),
+        "float64": pa.float64(),
+        "int64": pa.int64(),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in SNAPSHOT_COLUMNS])
+
+
+class SnapshotExporter:
+    """Buffers pair snapshots and appends them as hive-partitioned columnar files
+
+    Files land under {output_dir}/{dataset}/chain_id=.../date=.../ and every
+    flush writes new part files, so existing partitions are never rewritten.
+    The default Arrow IPC format is uncompressed and can be memory mapped.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        fmt: str = "arrow",
+        max_rows: int = 100000,
+        run_id: Optional[str] = None,
+        dataset: str = "pair_snapshots",
+    ):
+        if pa is None:
+            raise RuntimeError("pyarrow is required for snapshot export")
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+
+        self.output_dir = output_dir
+        self.fmt = fmt
+        self.max_rows = max_rows
+        self.run_id = run_id
+        self.dataset = dataset
+        self.schema = _arrow_schema()
+        self.rows_buffered = 0
+        self.rows_written = 0
+        self._partitions: Dict[Tuple[str, str], Dict[str, List]] = {}
+
+    def add(
+        self,
+        token_address: str,
+        pairs: List[PairSnapshot],
+        timestamp: Optional[datetime] = None,
+    ) -> None:
+        now = timestamp or datetime.now(timezone.utc)
+        date = now.strftime("%Y-%m-%d")
+
+        for pair in pairs:
+            columns = self._partitions.get((pair.chain_id, date))
+            if columns is None:
+                columns = {name: [] for name, _ in SNAPSHOT_COLUMNS}
+                self._partitions[(pair.chain_id, date)] = columns
+
+            columns["timestamp"].append(now)
+            columns["run_id"].append(self.run_id)
+            columns["dex_id"].append(pair.dex_id)
+            columns["token_address"].append(token_address)
+            columns["pair_address"].append(pair.pair_address)
+            columns["base_token_address"].append(pair.base_token_address)
+            columns["quote_token_address"].append(pair.quote_token_address)
+            columns["price_usd"].append(pair.price_usd)
+            columns["price_native"].append(pair.price_native)
+            columns["liquidity_usd"].append(pair.liquidity_usd)
+            columns["volume_24h"].append(pair.volume_24h)
+            columns["price_change_24h"].append(pair.price_change_24h)
+            columns["pair_created_at"].append(pair.pair_created_at)
+
+        self.rows_buffered += len(pairs)
+
+    async def process(
+        self,
+        token_address: str,
+        pairs: List[PairSnapshot],
+        timestamp: Optional[datetime] = None,
+    ) -> None:
+        """Buffer a token's pairs and flush once the buffer is full"""
+        self.add(token_address, pairs, timestamp)
+        if self.rows_buffered >= self.max_rows:
+            await self.flush()
+
+    async def flush(self) -> None:
+        partitions, self._partitions = self._partitions, {}
+        rows, self.rows_buffered = self.rows_buffered, 0
+        if not partitions:
+            return
+
+        # File writes happen off the event loop
+        await asyncio.to_thread(self._write_partitions, partitions)
+        self.rows_written += rows
+        logger.info(
+            f"Exported {rows} rows to {len(partitions)} {self.dataset} partitions"
+        )
+
+    def _write_partitions(
+        self, partitions: Dict[Tuple[str, str], Dict[str, List]]
+    ) -> None:
+        for (chain_id, date), columns in partitions.items():
+            table = pa.table(columns, schema=self.schema)
+            directory = os.path.join(
+                self.output_dir, self.dataset, f"chain_id={chain_id}", f"date={date}"
+            )
+            os.makedirs(directory, exist_ok=True)
+
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+            name = f"part-{stamp}-{uuid.uuid4().hex[:8]}.{EXPORT_FORMATS[self.fmt]}"
+            path = os.path.join(directory, name)
+
+            # Write to a temp name so readers never see a partial file; the
+            # "." prefix keeps pyarrow.dataset from listing a leftover one
+            tmp_path = os.path.join(directory, f".{name}.tmp")
+            if self.fmt == "parquet":
+                pq.write_table(table, tmp_path, compression="zstd")
+            else:
+                with pa.OSFile(tmp_path, "wb") as sink:
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+            os.replace(tmp_path, path)
+
+
+def _parse_updated_at(metrics: Dict[bytes, bytes]) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(metrics[b"updated_at"].decode())
+    except (KeyError, ValueError):
+        return None
+
+
+async def export_redis_state(
+    redis_client: redis.Redis,
+    output_dir: str,
+    fmt: str = "arrow",
+    run_id: Optional[str] = None,
+    batch_size: int = 1000,
+    max_rows: int = 100000,
+) -> None:
+    """Write the current per-pair metrics held in Redis as a pair_state dataset
+
+    Uses its own exporter so state rows never mix with the snapshot buffer.
+    Rows carry the metrics' own updated_at rather than the export time.
+    """
+    exporter = SnapshotExporter(
+        output_dir, fmt, max_rows=max_rows, run_id=run_id, dataset="pair_state"
+    )
+
+    async def export_keys(keys: List[bytes]) -> None:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.hgetall(key)
+            results = await pipe.execute()
+
+        for key, metrics in zip(keys, results):
+            pair = PairSnapshot.from_redis_metrics(metrics)
+            if pair:
+                token_address = key.decode().split(":")[2]
+                await exporter.process(
+                    token_address, [pair], _parse_updated_at(metrics)
+                )
+
+    keys = []
+    async for key in redis_client.scan_iter(
+        match=f"{REDIS_PREFIX}pairs:*:pair:*:metrics", count=batch_size
+    ):
+        keys.append(key)
+        if len(keys) >= batch_size:
+            await export_keys(keys)
+            keys = []
+    if keys:
+        await export_keys(keys)
+
+    await exporter.flush()
+
+
+def open_snapshot_dataset(
+    output_dir: str, dataset: str = "pair_snapshots", fmt: str = "arrow"
+) -> "ds.Dataset":
+    """Open an exported dataset with its chain_id/date partitions as columns"""
+    return ds.dataset(
+        os.path.join(output_dir, dataset),
+        format="ipc" if fmt == "arrow" else "parquet",
+        partitioning="hive",
+    )
+
+
+def read_arrow_partition_file(path: str) -> "pa.Table":
+    """Memory map a single Arrow part file; the table references the mapping"""
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
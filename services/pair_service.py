@@ -1,18 +1,66 @@
 import asyncio
+import time
 import redis.asyncio as redis
 from arango import ArangoClient
-from typing import List, Dict
+from typing import List, Dict, Optional
 from config import logger
 from models.stats import PipelineStats
-from api.dexscreener import fetch_token_pairs, fetch_pairs_batch
-from db.redis_operations import store_token_pairs_in_redis
+from models.pair import PairSnapshot
+from api.dexscreener import (
+    fetch_token_pairs,
+    fetch_pairs_batch,
+    fetch_pairs_by_address,
+)
+from db.redis_operations import (
+    store_token_pairs_in_redis,
+    get_tracked_pair_addresses,
+    get_discovery_times,
+    mark_tokens_discovered,
+)
 from db.arango_operations import store_pair_data
 from services.token_service import aggregate_solana_tokens
+from services.signal_service import SignalEngine
+from services.run_service import RunCheckpoint
+from services.export_service import SnapshotExporter
+
+
+async def store_token_pairs(
+    address: str,
+    chain_id: str,
+    pairs: List[PairSnapshot],
+    metadata: Dict,
+    redis_client: redis.Redis,
+    db: ArangoClient,
+    run_id: Optional[str] = None,
+    signal_engine: Optional[SignalEngine] = None,
+    exporter: Optional[SnapshotExporter] = None,
+    update_summary: bool = True,
+) -> bool:
+    """Write a token's pairs to Redis and ArangoDB, True if both succeeded"""
+    redis_ok, arango_ok = await asyncio.gather(
+        store_token_pairs_in_redis(
+            address, pairs, redis_client, update_summary=update_summary
+        ),
+        store_pair_data(db, address, chain_id, pairs, metadata, run_id),
+    )
+    if signal_engine:
+        await signal_engine.process(redis_client, address, pairs)
+    if exporter:
+        await exporter.process(address, pairs)
+    return redis_ok and arango_ok
 
 
 async def process_pair_batch(
-    batch: List[Dict], redis_client: redis.Redis, db: ArangoClient, stats: PipelineStats
+    batch: List[Dict],
+    redis_client: redis.Redis,
+    db: ArangoClient,
+    stats: PipelineStats,
+    signal_engine: Optional[SignalEngine] = None,
+    checkpoint: Optional[RunCheckpoint] = None,
+    exporter: Optional[SnapshotExporter] = None,
 ) -> None:
+    run_id = checkpoint.run_id if checkpoint else None
+
     # Process each token in the batch concurrently
     pair_tasks = []
     for token in batch:
@@ -28,39 +76,93 @@ async def process_pair_batch(
 
     # Store results concurrently
     store_tasks = []
+    stored_addresses = []
+    completed = []
     for token, task in pair_tasks:
         try:
             pairs = await task
-            if pairs:
+            if pairs == []:
+                # The lookup succeeded but there is nothing to store
+                completed.append(token["address"])
+            elif pairs:
                 address = token["address"]
                 metadata = token["metadata"]
                 chain_id = next(iter(metadata.values())).get("chain_id", "solana")
 
-                store_tasks.extend(
-                    [
-                        store_token_pairs_in_redis(address, pairs, redis_client),
-                        store_pair_data(db, address, chain_id, pairs, metadata),
-                    ]
+                store_tasks.append(
+                    store_token_pairs(
+                        address,
+                        chain_id,
+                        pairs,
+                        metadata,
+                        redis_client,
+                        db,
+                        run_id,
+                        signal_engine,
+                        exporter,
+                    )
                 )
+                stored_addresses.append(address)
                 stats.tokens_processed += 1
         except Exception as e:
             logger.error(f"Error processing token {token['address']}: {str(e)}")
 
     if store_tasks:
-        await asyncio.gather(*store_tasks)
+        results = await asyncio.gather(*store_tasks)
+        stored = [address for address, ok in zip(stored_addresses, results) if ok]
+        await mark_tokens_discovered(redis_client, stored)
+        completed.extend(stored)
+    if checkpoint:
+        await checkpoint.mark_completed(completed)
+
+
+async def skip_completed_tokens(
+    tokens: List[Dict], checkpoint: Optional[RunCheckpoint]
+) -> List[Dict]:
+    if checkpoint and checkpoint.resumed:
+        completed = await checkpoint.completed_tokens()
+        tokens = [token for token in tokens if token["address"] not in completed]
+        logger.info(
+            f"Skipping {len(completed)} tokens already refreshed in run "
+            f"{checkpoint.run_id}"
+        )
+    return tokens
 
 
 async def process_solana_pairs(
-    redis_client: redis.Redis, db: ArangoClient, stats: PipelineStats
+    redis_client: redis.Redis,
+    db: ArangoClient,
+    stats: PipelineStats,
+    signal_engine: Optional[SignalEngine] = None,
+    checkpoint: Optional[RunCheckpoint] = None,
+    exporter: Optional[SnapshotExporter] = None,
 ) -> None:
     tokens = await aggregate_solana_tokens(redis_client)
+    tokens = await skip_completed_tokens(tokens, checkpoint)
+    await process_token_batches(
+        tokens, redis_client, db, stats, signal_engine, checkpoint, exporter
+    )
+
+
+async def process_token_batches(
+    tokens: List[Dict],
+    redis_client: redis.Redis,
+    db: ArangoClient,
+    stats: PipelineStats,
+    signal_engine: Optional[SignalEngine] = None,
+    checkpoint: Optional[RunCheckpoint] = None,
+    exporter: Optional[SnapshotExporter] = None,
+) -> None:
+    """Run the full /token-pairs lookup for tokens in batches"""
     total_tokens = len(tokens)
     batch_size = 30  # Increased batch size for parallel processing
     total_batches = (total_tokens + batch_size - 1) // batch_size
 
     for i in range(0, total_tokens, batch_size):
         batch = tokens[i : i + batch_size]
-        await process_pair_batch(batch, redis_client, db, stats)
+        await process_pair_batch(
+            batch, redis_client, db, stats, signal_engine, checkpoint, exporter
+        )
 
         current_batch = i // batch_size + 1
         progress = (current_batch / total_batches) * 100
@@ -72,12 +174,154 @@ async def process_solana_pairs(
         await asyncio.sleep(0.1)
 
 
+async def refresh_known_pairs(
+    redis_client: redis.Redis,
+    db: ArangoClient,
+    stats: PipelineStats,
+    signal_engine: Optional[SignalEngine] = None,
+    checkpoint: Optional[RunCheckpoint] = None,
+    exporter: Optional[SnapshotExporter] = None,
+    discovery_interval: int = 3600,
+    pairs_per_request: int = 30,
+    concurrent_requests: int = 10,
+) -> None:
+    """Re-price tracked pairs by address, discovering pairs only when due
+
+    Tokens without tracked pairs, or whose last /token-pairs lookup is older
+    than discovery_interval seconds, go through the full lookup so newly
+    created pairs are found. Every other token is refreshed through the
+    multi-pair endpoint, up to pairs_per_request pairs per request.
+    """
+    tokens = await aggregate_solana_tokens(redis_client)
+    tokens = await skip_completed_tokens(tokens, checkpoint)
+    run_id = checkpoint.run_id if checkpoint else None
+
+    discovered_at = await get_discovery_times(redis_client)
+    tracked = await asyncio.gather(
+        *[get_tracked_pair_addresses(redis_client, t["address"]) for t in tokens]
+    )
+
+    now = time.time()
+    discover = []
+    known = []
+    for token, pair_addresses in zip(tokens, tracked):
+        last_discovery = discovered_at.get(token["address"], 0)
+        if pair_addresses and now - last_discovery < discovery_interval:
+            known.append((token, pair_addresses))
+        else:
+            discover.append(token)
+
+    logger.info(
+        f"Refreshing {len(known)} tokens by pair address, "
+        f"discovering pairs for {len(discover)} tokens"
+    )
+
+    if discover:
+        await process_token_batches(
+            discover, redis_client, db, stats, signal_engine, checkpoint, exporter
+        )
+
+    # Group tracked pairs per chain so each request covers one chain. A pair
+    # can be tracked under several tokens but is only requested once.
+    owners = {}
+    chain_pairs = {}
+    for token, pair_addresses in known:
+        chain_id = next(iter(token["metadata"].values())).get("chain_id", "solana")
+        for pair_address in pair_addresses:
+            key = (chain_id, pair_address)
+            if key not in owners:
+                owners[key] = []
+                chain_pairs.setdefault(chain_id, []).append(pair_address)
+            owners[key].append(token)
+
+    requests = [
+        (chain_id, addresses[i : i + pairs_per_request])
+        for chain_id, addresses in chain_pairs.items()
+        for i in range(0, len(addresses), pairs_per_request)
+    ]
+    logger.info(f"Refreshing {len(owners)} tracked pairs with {len(requests)} requests")
+
+    refreshed = {token["address"]: (token, []) for token, _ in known}
+    observed = {}
+    failed = set()
+    for i in range(0, len(requests), concurrent_requests):
+        batch = requests[i : i + concurrent_requests]
+        results = await asyncio.gather(
+            *[
+                fetch_pairs_by_address(chain_id, addresses, stats, redis_client)
+                for chain_id, addresses in batch
+            ],
+            return_exceptions=True,
+        )
+        for (chain_id, addresses), pairs in zip(batch, results):
+            if isinstance(pairs, Exception) or pairs is None:
+                if pairs is not None:
+                    logger.error(f"Pair refresh failed on {chain_id}: {str(pairs)}")
+                # Owners of these pairs were not fully refreshed this run
+                for pair_address in addresses:
+                    for token in owners[(chain_id, pair_address)]:
+                        failed.add(token["address"])
+                continue
+            for pair in pairs:
+                pair_owners = owners.get((chain_id, pair.pair_address))
+                if not pair_owners:
+                    continue
+                observed[(chain_id, pair.pair_address)] = (pair_owners[0], pair)
+                for token in pair_owners:
+                    refreshed[token["address"]][1].append(pair)
+        await asyncio.sleep(0.1)
+
+    # Signal state is kept per pair, so each pair is observed once per cycle
+    # under its first owner rather than once for every token that tracks it
+    if signal_engine:
+        signal_pairs = {}
+        for token, pair in observed.values():
+            signal_pairs.setdefault(token["address"], []).append(pair)
+        for token_address, pairs in signal_pairs.items():
+            await signal_engine.process(redis_client, token_address, pairs)
+
+    # Store per token so checkpoints stay token-scoped. The pairs returned
+    # are a subset of what discovery found, so the summary is left alone.
+    entries = [entry for entry in refreshed.values() if entry[1]]
+    for i in range(0, len(entries), 30):
+        batch = entries[i : i + 30]
+        results = await asyncio.gather(
+            *[
+                store_token_pairs(
+                    token["address"],
+                    next(iter(token["metadata"].values())).get("chain_id", "solana"),
+                    pairs,
+                    token["metadata"],
+                    redis_client,
+                    db,
+                    run_id,
+                    exporter=exporter,
+                    update_summary=False,
+                )
+                for token, pairs in batch
+            ]
+        )
+        for (token, _), ok in zip(batch, results):
+            if ok:
+                stats.tokens_processed += 1
+            else:
+                failed.add(token["address"])
+
+    # A token is done only once every request covering its pairs succeeded
+    if checkpoint:
+        await checkpoint.mark_completed(
+            address for address in refreshed if address not in failed
+        )
+
+
 # Bulk processing function for maximum throughput
 async def bulk_process_pairs(
     redis_client: redis.Redis,
     db: ArangoClient,
     stats: PipelineStats,
     concurrency_limit: int = 50,
+    signal_engine: Optional[SignalEngine] = None,
+    exporter: Optional[SnapshotExporter] = None,
 ) -> None:
     tokens = await aggregate_solana_tokens(redis_client)
     semaphore = asyncio.Semaphore(concurrency_limit)
@@ -91,13 +335,23 @@ async def bulk_process_pairs(
             try:
                 pairs = await fetch_token_pairs(address, chain_id, stats, redis_client)
                 if pairs:
-                    await asyncio.gather(
-                        store_token_pairs_in_redis(address, pairs, redis_client),
-                        store_pair_data(db, address, chain_id, pairs, metadata),
+                    stored = await store_token_pairs(
+                        address,
+                        chain_id,
+                        pairs,
+                        metadata,
+                        redis_client,
+                        db,
+                        signal_engine=signal_engine,
+                        exporter=exporter,
                     )
+                    if stored:
+                        await mark_tokens_discovered(redis_client, [address])
                     stats.tokens_processed += 1
             except Exception as e:
                 logger.error(f"Failed to process token {address}: {str(e)}")
 
     tasks = [process_with_semaphore(token) for token in tokens]
     await asyncio.gather(*tasks)
+    if exporter:
+        await exporter.flush()
@@ -0,0 +1,96 @@
+import time
+import uuid
+import redis.asyncio as redis
+from typing import Iterable, Optional, Set
+from config import logger, REDIS_PREFIX
+
+RUN_CURRENT_KEY = f"{REDIS_PREFIX}run:current"
+
+PIPELINE_PHASES = [
+    "latest_boosts",
+    "top_boosts",
+    "token_profiles",
+    "pairs",
+    "done",
+]
+
+
+class RunCheckpoint:
+    """Per-run progress stored in Redis so an interrupted run can resume"""
+
+    def __init__(self, redis_client: redis.Redis, cycle_ttl: int = 900):
+        # An unfinished run with no progress for cycle_ttl seconds is abandoned
+        self.redis_client = redis_client
+        self.cycle_ttl = cycle_ttl
+        self.run_id: Optional[str] = None
+        self.phase = PIPELINE_PHASES[0]
+        self.resumed = False
+
+    @property
+    def completed_key(self) -> str:
+        return f"{REDIS_PREFIX}run:{self.run_id}:completed"
+
+    async def start(self) -> None:
+        """Resume the unfinished run of the current cycle or begin a new one"""
+        current = await self.redis_client.hgetall(RUN_CURRENT_KEY)
+        now = time.time()
+
+        if current and current.get(b"phase", b"").decode() != "done":
+            updated_at = float(
+                current.get(b"updated_at", current[b"started_at"]).decode()
+            )
+            if now - updated_at < self.cycle_ttl:
+                self.run_id = current[b"run_id"].decode()
+                self.phase = current[b"phase"].decode()
+                self.resumed = True
+                await self.touch()
+                completed = await self.redis_client.scard(self.completed_key)
+                logger.info(
+                    f"Resuming run {self.run_id} at phase {self.phase} "
+                    f"({completed} tokens already completed)"
+                )
+                return
+            logger.info(f"Abandoning stale run {current[b'run_id'].decode()}")
+
+        self.run_id = uuid.uuid4().hex
+        self.phase = PIPELINE_PHASES[0]
+        await self.redis_client.hset(
+            RUN_CURRENT_KEY,
+            mapping={
+                "run_id": self.run_id,
+                "phase": self.phase,
+                "started_at": str(now),
+                "updated_at": str(now),
+            },
+        )
+        await self.redis_client.expire(RUN_CURRENT_KEY, self.cycle_ttl * 2)
+        logger.info(f"Starting run {self.run_id}")
+
+    async def touch(self, **fields: str) -> None:
+        """Record progress so the run counts as live for another cycle_ttl"""
+        fields["updated_at"] = str(time.time())
+        await self.redis_client.hset(RUN_CURRENT_KEY, mapping=fields)
+        await self.redis_client.expire(RUN_CURRENT_KEY, self.cycle_ttl * 2)
+
+    def phase_done(self, phase: str) -> bool:
+        return PIPELINE_PHASES.index(phase) < PIPELINE_PHASES.index(self.phase)
+
+    async def complete_phase(self, phase: str) -> None:
+        self.phase = PIPELINE_PHASES[PIPELINE_PHASES.index(phase) + 1]
+        await self.touch(phase=self.phase)
+
+    async def completed_tokens(self) -> Set[str]:
+        members = await self.redis_client.smembers(self.completed_key)
+        return {m.decode() if isinstance(m, bytes) else m for m in members}
+
+    async def mark_completed(self, token_addresses: Iterable[str]) -> None:
+        token_addresses = list(token_addresses)
+        if token_addresses:
+            await self.redis_client.sadd(self.completed_key, *token_addresses)
+            await self.redis_client.expire(self.completed_key, self.cycle_ttl * 2)
+            await self.touch()
+
+    async def finish(self) -> None:
+        await self.complete_phase("pairs")
+        await self.redis_client.delete(self.completed_key)
+        logger.info(f"Run {self.run_id} finished")
@@ -0,0 +1,216 @@
+import json
+import time
+import redis.asyncio as redis
+from datetime import datetime, timezone
+from typing import Dict, List
+from config import logger, REDIS_PREFIX
+from models.pair import PairSnapshot
+from models.signals import PairSignalState
+
+SIGNAL_STATE_KEY = f"{REDIS_PREFIX}signals:state"
+SIGNAL_ALERTS_STREAM = f"{REDIS_PREFIX}signals:alerts"
+
+
+class SignalConfig:
+    def __init__(
+        self,
+        halflife: float = 12,
+        window: int = 60,
+        warmup_samples: int = 10,
+        cooldown_samples: int = 30,
+        liquidity_drop_pct: float = 30.0,
+        volume_zscore: float = 4.0,
+        volume_spike_pct: float = 100.0,
+        price_move_pct: float = 25.0,
+        price_zscore: float = 3.0,
+        checkpoint_interval: float = 60.0,
+        stream_maxlen: int = 100000,
+        state_ttl: float = 7 * 24 * 3600,
+    ):
+        # Horizons are in samples, i.e. pipeline refreshes of the same pair
+        self.halflife = halflife
+        self.window = window
+        self.warmup_samples = warmup_samples
+        self.cooldown_samples = cooldown_samples
+        self.liquidity_drop_pct = liquidity_drop_pct
+        self.volume_zscore = volume_zscore
+        self.volume_spike_pct = volume_spike_pct
+        self.price_move_pct = price_move_pct
+        self.price_zscore = price_zscore
+        self.checkpoint_interval = checkpoint_interval
+        self.stream_maxlen = stream_maxlen
+        # Windows of pairs not seen for state_ttl seconds are dropped on load
+        self.state_ttl = state_ttl
+
+
+class SignalEngine:
+    """Incremental per-pair signal detection over incoming snapshots"""
+
+    def __init__(self, config: SignalConfig = None):
+        self.config = config or SignalConfig()
+        self.states: Dict[str, PairSignalState] = {}
+        self.dirty = set()
+        self.alerts_emitted = 0
+        self.last_checkpoint = time.time()
+
+    async def load_checkpoint(self, redis_client: redis.Redis) -> None:
+        """Restore rolling windows saved by a previous run, pruning stale pairs"""
+        now = time.time()
+        expired = []
+        async for pair_address, data in redis_client.hscan_iter(SIGNAL_STATE_KEY):
+            try:
+                state = PairSignalState.from_dict(json.loads(data))
+            except Exception as e:
+                logger.warning(f"Dropping unreadable signal state: {str(e)}")
+                expired.append(pair_address)
+                continue
+
+            if state.last_seen is None:
+                # Saved before last_seen existed; stamp it on the next checkpoint
+                state.last_seen = now
+                self.dirty.add(pair_address.decode())
+            elif now - state.last_seen > self.config.state_ttl:
+                expired.append(pair_address)
+                continue
+            self.states[pair_address.decode()] = state
+
+        for i in range(0, len(expired), 1000):
+            await redis_client.hdel(SIGNAL_STATE_KEY, *expired[i : i + 1000])
+        logger.info(
+            f"Loaded signal state for {len(self.states)} pairs, "
+            f"pruned {len(expired)} stale pairs"
+        )
+
+    async def checkpoint(self, redis_client: redis.Redis) -> None:
+        """Persist the windows of pairs updated since the last checkpoint"""
+        self.last_checkpoint = time.time()
+        dirty, self.dirty = self.dirty, set()
+        if dirty:
+            mapping = {
+                pair_address: json.dumps(self.states[pair_address].to_dict())
+                for pair_address in dirty
+            }
+            try:
+                await redis_client.hset(SIGNAL_STATE_KEY, mapping=mapping)
+            except Exception:
+                # Keep the pairs dirty so the next checkpoint retries them
+                self.dirty |= dirty
+                raise
+            logger.debug(f"Checkpointed signal state for {len(mapping)} pairs")
+
+    def observe(self, token_address: str, pair: PairSnapshot) -> List[Dict]:
+        """Fold one snapshot into its pair's windows and return any fired alerts"""
+        cfg = self.config
+        state = self.states.get(pair.pair_address)
+        if state is None:
+            state = PairSignalState.create(cfg.halflife, cfg.window)
+            self.states[pair.pair_address] = state
+        self.dirty.add(pair.pair_address)
+        state.last_seen = time.time()
+
+        candidates = []
+        warmed_up = state.samples >= cfg.warmup_samples
+
+        if pair.liquidity_usd is not None:
+            peak = state.liquidity_range.max
+            if warmed_up and peak:
+                drop_pct = (1 - pair.liquidity_usd / peak) * 100
+                if drop_pct >= cfg.liquidity_drop_pct:
+                    candidates.append(
+                        ("liquidity_pull", {"drop_pct": drop_pct, "peak": peak})
+                    )
+            state.liquidity_range.update(pair.liquidity_usd)
+
+        # A z-score is undefined after a perfectly flat history, so the
+        # percentage thresholds alone decide in that case. A flat zero mean
+        # (a dead pair) gives no baseline to measure a spike against.
+        if pair.volume_24h is not None:
+            zscore = state.volume.zscore(pair.volume_24h)
+            mean = state.volume.mean
+            if (
+                warmed_up
+                and (zscore >= cfg.volume_zscore if zscore is not None else mean > 0)
+                and pair.volume_24h >= mean * (1 + cfg.volume_spike_pct / 100)
+            ):
+                candidates.append(("volume_spike", {"zscore": zscore, "mean": mean}))
+            state.volume.update(pair.volume_24h)
+
+        if pair.price_usd is not None:
+            zscore = state.price.zscore(pair.price_usd)
+            low, high = state.price_range.min, state.price_range.max
+            if warmed_up and (zscore is None or abs(zscore) >= cfg.price_zscore):
+                move_pct = 0.0
+                if pair.price_usd > state.price.mean and low:
+                    move_pct = (pair.price_usd / low - 1) * 100
+                elif pair.price_usd < state.price.mean and high:
+                    move_pct = (pair.price_usd / high - 1) * 100
+                if abs(move_pct) >= cfg.price_move_pct:
+                    candidates.append(
+                        ("price_move", {"move_pct": move_pct, "zscore": zscore})
+                    )
+            state.price.update(pair.price_usd)
+            state.price_range.update(pair.price_usd)
+
+        alerts = []
+        for signal, fields in candidates:
+            last = state.last_alerts.get(signal)
+            if last is not None and state.samples - last < cfg.cooldown_samples:
+                continue
+            state.last_alerts[signal] = state.samples
+            alerts.append(
+                {
+                    "signal": signal,
+                    "token_address": token_address,
+                    "pair_address": pair.pair_address,
+                    "chain_id": pair.chain_id,
+                    "dex_id": pair.dex_id,
+                    "price_usd": pair.price_usd,
+                    "liquidity_usd": pair.liquidity_usd,
+                    "volume_24h": pair.volume_24h,
+                    **fields,
+                }
+            )
+
+        state.samples += 1
+        return alerts
+
+    async def process(
+        self,
+        redis_client: redis.Redis,
+        token_address: str,
+        pairs: List[PairSnapshot],
+    ) -> None:
+        """Observe a token's fresh pairs, publish alerts and checkpoint when due"""
+        try:
+            alerts = []
+            for pair in pairs:
+                alerts.extend(self.observe(token_address, pair))
+
+            if alerts:
+                await self.emit(redis_client, alerts)
+
+            if time.time() - self.last_checkpoint >= self.config.checkpoint_interval:
+                await self.checkpoint(redis_client)
+
+        except Exception as e:
+            logger.error(
+                f"Signal processing failed for token {token_address}: {str(e)}"
+            )
+            logger.error("Error details:", exc_info=True)
+
+    async def emit(self, redis_client: redis.Redis, alerts: List[Dict]) -> None:
+        timestamp = datetime.now(timezone.utc).isoformat()
+        for alert in alerts:
+            logger.info(
+                f"Signal {alert['signal']} on {alert['chain_id']}/{alert['dex_id']} "
+                f"{alert['pair_address']}"
+            )
+            fields = {k: "" if v is None else str(v) for k, v in alert.items()}
+            fields["timestamp"] = timestamp
+            await redis_client.xadd(
+                SIGNAL_ALERTS_STREAM,
+                fields,
+                maxlen=self.config.stream_maxlen,
+                approximate=True,
+            )
+        self.alerts_emitted += len(alerts)
@@ -6,6 +6,28 @@ class Config(BaseSettings):
     ARANGO_PASS: str
     PROXY_USERNAME: str = ""
     PROXY_PASSWORD: str = ""
+    LOOP_LAG_THRESHOLD_MS: float = 100.0
+    PROFILE_PHASES: str = ""
+    PROFILE_DIR: str = "profiles"
+    EXPORT_DIR: str = ""
+    EXPORT_FORMAT: str = "arrow"
+    EXPORT_REDIS_STATE: bool = False
+    PAIR_REFRESH_MODE: str = "tokens"
+    PAIR_DISCOVERY_INTERVAL: int = 3600
+    HISTORY_REPORT_HOURS: int = 0
+    RUN_CYCLE_TTL: int = 900
+    SIGNAL_HALFLIFE: float = 12
+    SIGNAL_WINDOW: int = 60
+    SIGNAL_WARMUP_SAMPLES: int = 10
+    SIGNAL_COOLDOWN_SAMPLES: int = 30
+    SIGNAL_LIQUIDITY_DROP_PCT: float = 30.0
+    SIGNAL_VOLUME_ZSCORE: float = 4.0
+    SIGNAL_VOLUME_SPIKE_PCT: float = 100.0
+    SIGNAL_PRICE_MOVE_PCT: float = 25.0
+    SIGNAL_PRICE_ZSCORE: float = 3.0
+    SIGNAL_CHECKPOINT_INTERVAL: float = 60.0
+    SIGNAL_STREAM_MAXLEN: int = 100000
+    SIGNAL_STATE_TTL: float = 604800
 
     class Config:
         env_file = ".env"
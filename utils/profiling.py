@@ -0,0 +1,212 @@
+import asyncio
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+from config import logger
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag and logs the loop thread's stack during stalls
+
+    A coroutine on the loop refreshes a heartbeat every `interval` seconds and
+    records how late it woke up. A watchdog thread checks the heartbeat, so a
+    blocking callback can be caught and its stack logged while it is running.
+    """
+
+    def __init__(self, threshold: float = 0.1, interval: float = 0.05):
+        self.threshold = threshold
+        self.interval = interval
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+        self.samples = 0
+        self.stalls = 0
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.get_running_loop().create_task(self._measure())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-lag-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self.log_summary()
+
+    async def _measure(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._heartbeat = now
+
+            self.samples += 1
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+
+    def _watch(self) -> None:
+        reported_heartbeat = None
+        while not self._stopped.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            stalled_for = time.monotonic() - heartbeat - self.interval
+            if stalled_for < self.threshold or heartbeat == reported_heartbeat:
+                continue
+
+            # Report each stall once, with the stack of whatever is blocking
+            reported_heartbeat = heartbeat
+            self.stalls += 1
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "unavailable"
+            logger.warning(
+                f"Event loop blocked for {stalled_for * 1000:.1f}ms, "
+                f"loop thread stack:\n{stack}"
+            )
+
+    def log_summary(self) -> None:
+        avg_lag = self.total_lag / self.samples if self.samples else 0.0
+        logger.info(
+            f"Event loop lag: avg {avg_lag * 1000:.1f}ms, "
+            f"max {self.max_lag * 1000:.1f}ms, {self.stalls} stalls"
+        )
+
+
+class SamplingProfiler:
+    """Samples one thread's stack at a fixed interval into collapsed stacks"""
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._sample, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread:
+            self._thread.join()
+
+    def _sample(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}"
+                    f":{frame.f_lineno})"
+                )
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def dump(self, path: str) -> None:
+        """Write samples in collapsed-stack format, readable by flamegraph tools"""
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class PhaseProfiler:
+    """Runs the sampling profiler for selected pipeline phases
+
+    Phases listed at construction are always profiled. SIGUSR1 toggles
+    profiling of the phase that is currently running.
+    """
+
+    def __init__(
+        self,
+        phases: Iterable[str] = (),
+        output_dir: str = "profiles",
+        interval: float = 0.005,
+    ):
+        self.phases = set(phases)
+        self.output_dir = output_dir
+        self.interval = interval
+        self.current_phase: Optional[str] = None
+        self._profiler: Optional[SamplingProfiler] = None
+        self._thread_id: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def install_signal_handler(self) -> None:
+        self._thread_id = threading.get_ident()
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGUSR1, self.toggle)
+            self._loop = loop
+        except (NotImplementedError, AttributeError):
+            logger.warning("SIGUSR1 profiling toggle not supported on this platform")
+
+    def remove_signal_handler(self) -> None:
+        if self._loop:
+            self._loop.remove_signal_handler(signal.SIGUSR1)
+            self._loop = None
+
+    def toggle(self) -> None:
+        if self._profiler:
+            logger.info(f"Profiling of phase {self.current_phase} stopped by signal")
+            self._stop()
+        elif self.current_phase:
+            logger.info(f"Profiling of phase {self.current_phase} started by signal")
+            self._start()
+
+    @contextmanager
+    def phase(self, name: str):
+        self.current_phase = name
+        if name in self.phases:
+            self._start()
+        try:
+            yield
+        finally:
+            if self._profiler:
+                self._stop()
+            self.current_phase = None
+
+    def _start(self) -> None:
+        self._profiler = SamplingProfiler(
+            self._thread_id or threading.get_ident(), self.interval
+        )
+        self._profiler.start()
+
+    def _stop(self) -> None:
+        profiler, self._profiler = self._profiler, None
+        profiler.stop()
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        path = os.path.join(
+            self.output_dir, f"{self.current_phase}-{timestamp}.collapsed"
+        )
+        profiler.dump(path)
+        logger.info(
+            f"Wrote profile of phase {self.current_phase} "
+            f"({sum(profiler.stacks.values())} samples) to {path}"
+        )